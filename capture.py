@@ -0,0 +1,198 @@
+# Name: Targets Capture
+# Date: 10/19/2026
+# Version 2.0
+
+# Records games of Targets without slowing down the main loop.
+
+import threading, queue, subprocess, struct, zlib
+import os, os.path as path
+
+def write_png(file, pixels, size, pixelFormat):
+    '''write_png(file, pixels, size, pixelFormat) -> None
+    writes the 32 bit pixels of an image with size to the png file
+    (pygame cannot save pngs outside of the main thread)'''
+    # drop the unused alpha byte of the screen
+    rgb = bytearray(size[0]*size[1]*3)
+    red, blue = (2, 0) if pixelFormat == "BGRA" else (0, 2)
+    rgb[0::3] = pixels[red::4]
+    rgb[1::3] = pixels[1::4]
+    rgb[2::3] = pixels[blue::4]
+
+    rowSize = size[0]*3
+    rows = b"".join(b"\x00"+rgb[y*rowSize:(y+1)*rowSize] for y in range(size[1]))
+
+    def chunk(name, data):
+        return struct.pack(">I", len(data))+name+data+struct.pack(">I", zlib.crc32(name+data))
+
+    with open(file, "wb") as png:
+        png.write(b"\x89PNG\r\n\x1a\n")
+        png.write(chunk(b"IHDR", struct.pack(">IIBBBBB", size[0], size[1], 8, 2, 0, 0, 0)))
+        png.write(chunk(b"IDAT", zlib.compress(rows, 1)))
+        png.write(chunk(b"IEND", b""))
+
+class GameCapture:
+    '''copies finished frames off the screen and writes them from a background thread'''
+
+    def __init__(self, screen, output, mode="raw", rate=30, queueSize=8):
+        '''GameCapture(screen, output, mode, rate, queueSize) -> GameCapture
+        constructs the capture of screen to output at rate frames a second
+        mode is "raw" (one file of frames), "png" (a folder of images) or "video" (piped to ffmpeg)
+        at most queueSize frames wait for the writer before frames are dropped'''
+        if screen.get_bytesize() != 4:
+            raise ValueError("capture needs a 32 bit display")
+        if mode not in ("raw", "png", "video"):
+            raise ValueError(f"unknown capture mode {mode}")
+        if rate <= 0:
+            raise ValueError("capture rate must be above 0")
+
+        self.screen = screen
+        self.output = output
+        self.mode = mode
+        self.rate = rate
+        self.size = screen.get_size()
+
+        # byte order of the pixels in memory
+        if screen.get_masks()[0] == 0xff0000:
+            self.pixelFormat = "BGRA"
+        else:
+            self.pixelFormat = "RGBA"
+
+        # the same few buffers are reused for every frame
+        self.free = queue.Queue()
+        for i in range(queueSize):
+            self.free.put(bytearray(self.size[0]*self.size[1]*4))
+        self.frames = queue.Queue(queueSize)
+
+        self.captured = 0
+        self.written = 0
+        self.dropped = 0
+        self.lastCapture = 0
+        self.error = None
+        self.thread = None
+        self.file = None
+        self.process = None
+
+    def get_pixel_format(self):
+        '''GameCapture.get_pixel_format() -> str
+        returns the order of the bytes of each pixel'''
+        return self.pixelFormat
+
+    def get_captured(self):
+        '''GameCapture.get_captured() -> int
+        returns how many frames have been copied for the writer'''
+        return self.captured
+
+    def get_written(self):
+        '''GameCapture.get_written() -> int
+        returns how many frames have been written'''
+        return self.written
+
+    def get_dropped(self):
+        '''GameCapture.get_dropped() -> int
+        returns how many frames were not copied because the writer fell behind or failed'''
+        return self.dropped
+
+    def get_error(self):
+        '''GameCapture.get_error() -> Exception
+        returns the error that stopped the writer, None if there was none'''
+        return self.error
+
+    def start(self):
+        '''GameCapture.start() -> None
+        opens the output and starts the writer
+        raises OSError if the output cannot be opened'''
+        if self.mode == "raw":
+            self.file = open(self.output, "wb")
+        elif self.mode == "png":
+            os.makedirs(self.output, exist_ok=True)
+        else:
+            try:
+                self.process = subprocess.Popen(["ffmpeg", "-loglevel", "error", "-y",
+                    "-f", "rawvideo", "-pix_fmt", self.pixelFormat.lower(),
+                    "-s", f"{self.size[0]}x{self.size[1]}", "-r", str(self.rate),
+                    "-i", "-", "-pix_fmt", "yuv420p", self.output], stdin=subprocess.PIPE)
+            except FileNotFoundError:
+                raise OSError("ffmpeg is needed to record video") from None
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        '''GameCapture.stop() -> None
+        writes the waiting frames and closes the output'''
+        if self.thread == None:
+            return
+        try:
+            self.frames.put(None, timeout=5)
+        except queue.Full:
+            pass
+        self.thread.join(5)
+        self.thread = None
+
+        try:
+            if self.file != None:
+                self.file.close()
+            if self.process != None:
+                self.process.stdin.close()
+                self.process.wait()
+        except OSError as error:
+            if self.error == None:
+                self.error = error
+
+    def is_due(self, now):
+        '''GameCapture.is_due(now) -> bool
+        returns whether it is time to capture another frame at time now in seconds'''
+        return now-self.lastCapture >= 1/self.rate
+
+    def capture(self, now):
+        '''GameCapture.capture(now) -> bool
+        copies the screen for the writer at time now, call after pygame.display.update()
+        returns False if the frame was dropped'''
+        self.lastCapture = now
+        if self.error != None:
+            self.dropped += 1
+            return False
+        try:
+            buffer = self.free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return False
+
+        # copy straight from the pixels of the screen, a 32 bit display has no padding between rows
+        view = self.screen.get_view("1")
+        pixels = memoryview(view).cast("B")
+        buffer[:] = pixels
+        pixels.release()
+        del view
+
+        self.captured += 1
+        self.frames.put_nowait(buffer)
+        return True
+
+    def run(self):
+        '''GameCapture.run() -> None
+        writes frames until stopped (runs in the writer thread)
+        after an error the frames are only drained so capture() and stop() never block
+        only written is counted here, the other counts belong to the main thread'''
+        while True:
+            buffer = self.frames.get()
+            if buffer == None:
+                return
+
+            if self.error == None:
+                try:
+                    self.write(buffer)
+                    self.written += 1
+                except Exception as error:
+                    self.error = error
+            self.free.put(buffer)
+
+    def write(self, buffer):
+        '''GameCapture.write(buffer) -> None
+        writes the frame in buffer to the output'''
+        if self.mode == "raw":
+            self.file.write(buffer)
+        elif self.mode == "png":
+            write_png(path.join(self.output, f"frame{self.written:06d}.png"), buffer, self.size, self.pixelFormat)
+        else:
+            self.process.stdin.write(buffer)
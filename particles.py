@@ -0,0 +1,126 @@
+# Name: Targets Particles
+# Date: 10/19/2026
+# Version 2.0
+
+# Particle effects for Targets, all particles are moved and drawn at once with numpy.
+
+import pygame
+import numpy as np
+
+class ParticleSystem:
+    '''moves and draws the particles of every effect together'''
+
+    def __init__(self, maxParticles=4000, quality=1, gravity=500):
+        '''ParticleSystem(maxParticles, quality, gravity) -> ParticleSystem
+        constructs the particle system with room for maxParticles
+        quality from 0 (no particles) to 1 scales how many particles each effect makes'''
+        self.maxParticles = max(0, int(maxParticles))
+        self.quality = min(max(quality, 0), 1)
+        self.gravity = gravity
+        self.random = np.random.default_rng()
+
+        # every particle lives in the first self.count rows
+        self.pos = np.zeros((self.maxParticles, 2), np.float32)
+        self.vel = np.zeros((self.maxParticles, 2), np.float32)
+        self.life = np.zeros(self.maxParticles, np.float32)
+        self.lifetime = np.ones(self.maxParticles, np.float32)
+        self.color = np.zeros((self.maxParticles, 3), np.float32)
+        self.count = 0
+        self.lastUpdate = None
+
+    def is_enabled(self):
+        '''ParticleSystem.is_enabled() -> bool
+        returns whether effects make any particles'''
+        return self.quality > 0 and self.maxParticles > 0
+
+    def get_count(self):
+        '''ParticleSystem.get_count() -> int
+        returns how many particles are alive'''
+        return self.count
+
+    def clear(self):
+        '''ParticleSystem.clear() -> None
+        removes all particles'''
+        self.count = 0
+
+    def shatter(self, image, pos, amount=800, speed=(60,260), lifetime=(0.4,0.9)):
+        '''ParticleSystem.shatter(image, pos, amount, speed, lifetime) -> int
+        breaks image centered at pos into up to amount particles flying outwards
+        returns how many particles were made'''
+        amount = min(int(amount*self.quality), self.maxParticles-self.count)
+        if amount <= 0:
+            return 0
+
+        # pick opaque pixels of the image to become particles
+        width, height = image.get_size()
+        xs = self.random.integers(0, width, amount*2)
+        ys = self.random.integers(0, height, amount*2)
+        alpha = pygame.surfarray.pixels_alpha(image)
+        opaque = alpha[xs, ys] > 127
+        del alpha
+        xs, ys = xs[opaque][:amount], ys[opaque][:amount]
+        amount = len(xs)
+
+        pixels = pygame.surfarray.pixels3d(image)
+        colors = pixels[xs, ys]
+        del pixels
+
+        # fly away from the center
+        offsets = np.stack((xs-width/2, ys-height/2), axis=1).astype(np.float32)
+        distance = np.maximum(np.hypot(offsets[:,0], offsets[:,1]), 1)[:,None]
+        speeds = self.random.uniform(speed[0], speed[1], amount)[:,None]
+
+        start, end = self.count, self.count+amount
+        self.pos[start:end] = offsets+pos
+        self.vel[start:end] = offsets/distance*speeds
+        self.lifetime[start:end] = self.random.uniform(lifetime[0], lifetime[1], amount)
+        self.life[start:end] = self.lifetime[start:end]
+        self.color[start:end] = colors
+        self.count = end
+        return amount
+
+    def update(self, surface, now):
+        '''ParticleSystem.update(surface, now) -> None
+        moves the particles to time now in seconds and draws them on surface'''
+        if self.lastUpdate == None:
+            self.lastUpdate = now
+        # do not jump after a long frame
+        timing = min(now-self.lastUpdate, 0.05)
+        self.lastUpdate = now
+        if self.count == 0:
+            return
+
+        # remove dead particles
+        count = self.count
+        self.life[:count] -= timing
+        alive = self.life[:count] > 0
+        if not alive.all():
+            count = int(alive.sum())
+            for array in (self.pos, self.vel, self.life, self.lifetime, self.color):
+                array[:count] = array[:self.count][alive]
+            self.count = count
+            if count == 0:
+                return
+
+        # move
+        self.vel[:count,1] += self.gravity*timing
+        self.pos[:count] += self.vel[:count]*timing
+        self.draw(surface)
+
+    def draw(self, surface):
+        '''ParticleSystem.draw(surface) -> None
+        draws all the particles on surface, fading them out as they die'''
+        width, height = surface.get_size()
+        size = 2 if self.quality >= 0.5 else 1
+        xs = self.pos[:self.count,0].astype(np.intp)
+        ys = self.pos[:self.count,1].astype(np.intp)
+        onScreen = (xs >= 0) & (ys >= 0) & (xs < width-size+1) & (ys < height-size+1)
+        xs, ys = xs[onScreen], ys[onScreen]
+        fade = (self.life[:self.count]/self.lifetime[:self.count])[onScreen][:,None]
+        color = self.color[:self.count][onScreen]*fade
+
+        pixels = pygame.surfarray.pixels3d(surface)
+        for dx in range(size):
+            for dy in range(size):
+                pixels[xs+dx, ys+dy] = pixels[xs+dx, ys+dy]*(1-fade)+color
+        del pixels
@@ -0,0 +1,432 @@
+# Name: Targets Spectator
+# Date: 10/19/2026
+# Version 2.0
+
+# Streams the state of a game of Targets to viewers on other screens.
+# Run this file to watch a game started with "targets.py --spectator-port".
+
+import asyncio, struct, threading, time, argparse
+from collections import OrderedDict
+
+LIGHT_COLORS = ("black", "green", "red", "yellow")
+TARGET_STATES = ("hidden", "visible", "breaking")
+
+KEYFRAME = 0
+DELTA = 1
+
+# type, seq, base seq, number of lights, number of targets
+FRAME_HEADER = struct.Struct("<BIIBB")
+LENGTH = struct.Struct("<H")
+ACK = struct.Struct("<I")
+
+# score, misses, crosshair x, crosshair y, laser progress
+GAME_LAYOUT = "IBhhB"
+LIGHT_LAYOUT = "B"
+# x, y, size in ten thousandths, state
+TARGET_LAYOUT = "hhHB"
+
+def get_layout(numLights, numTargets):
+    '''get_layout(numLights, numTargets) -> str
+    returns the struct codes of every value in a snapshot'''
+    return GAME_LAYOUT+LIGHT_LAYOUT*numLights+TARGET_LAYOUT*numTargets
+
+def flatten(snapshot):
+    '''flatten(snapshot) -> tuple
+    returns the number of lights, number of targets and the values of snapshot as a flat tuple of ints
+    deltas are made and applied on these, since sizes do not survive a round trip through floats'''
+    score, misses, crosshair, progress, lights, targets = snapshot
+    values = [score, misses, int(crosshair[0]), int(crosshair[1]), progress]
+    values.extend(LIGHT_COLORS.index(color) for color in lights)
+    for pos, size, state in targets:
+        values.extend((int(pos[0]), int(pos[1]), int(size*10000), TARGET_STATES.index(state)))
+    return len(lights), len(targets), tuple(values)
+
+def unflatten(flat):
+    '''unflatten(flat) -> tuple
+    returns the snapshot of the flat values from flatten'''
+    numLights, numTargets, values = flat
+    lights = tuple(LIGHT_COLORS[color] for color in values[5:5+numLights])
+    targets = []
+    for i in range(5+numLights, 5+numLights+4*numTargets, 4):
+        targets.append(((values[i], values[i+1]), values[i+2]/10000, TARGET_STATES[values[i+3]]))
+    return values[0], values[1], (values[2], values[3]), values[4], lights, tuple(targets)
+
+def encode_frame(seq, flat, baseSeq=None, base=None):
+    '''encode_frame(seq, flat, baseSeq, base) -> bytes
+    returns the flat snapshot as a frame, delta encoded against the flat snapshot base if given'''
+    numLights, numTargets, values = flat
+    layout = get_layout(numLights, numTargets)
+
+    # keyframe if there is nothing to compare against
+    if base == None or base[:2] != flat[:2]:
+        frame = FRAME_HEADER.pack(KEYFRAME, seq, 0, numLights, numTargets)+struct.pack("<"+layout, *values)
+        return LENGTH.pack(len(frame))+frame
+
+    # only send the values that changed
+    baseValues = base[2]
+    changed = bytearray((len(values)+7)//8)
+    codes = ""
+    deltaValues = []
+    for i in range(len(values)):
+        if values[i] != baseValues[i]:
+            changed[i//8] |= 1 << i%8
+            codes += layout[i]
+            deltaValues.append(values[i])
+
+    frame = FRAME_HEADER.pack(DELTA, seq, baseSeq, numLights, numTargets)+bytes(changed)+struct.pack("<"+codes, *deltaValues)
+    return LENGTH.pack(len(frame))+frame
+
+def decode_frame(frame, history):
+    '''decode_frame(frame, history) -> tuple
+    returns the seq and flat snapshot of frame (without its length)
+    history maps the seqs of decoded flat snapshots to the flat snapshots'''
+    frameType, seq, baseSeq, numLights, numTargets = FRAME_HEADER.unpack_from(frame)
+    layout = get_layout(numLights, numTargets)
+
+    if frameType == KEYFRAME:
+        values = struct.unpack_from("<"+layout, frame, FRAME_HEADER.size)
+        return seq, (numLights, numTargets, values)
+
+    # fill the changed values into the base
+    values = list(history[baseSeq][2])
+    changedSize = (len(values)+7)//8
+    changed = frame[FRAME_HEADER.size:FRAME_HEADER.size+changedSize]
+    indices = [i for i in range(len(values)) if changed[i//8] & 1 << i%8]
+    codes = "".join(layout[i] for i in indices)
+    for i, value in zip(indices, struct.unpack_from("<"+codes, frame, FRAME_HEADER.size+changedSize)):
+        values[i] = value
+    return seq, (numLights, numTargets, tuple(values))
+
+class SpectatorServer:
+    '''sends the state of the game to spectators from a background thread'''
+
+    def __init__(self, host="127.0.0.1", port=0, rate=15, historySize=64):
+        '''SpectatorServer(host, port, rate, historySize) -> SpectatorServer
+        constructs the server sending rate snapshots a second on host and port'''
+        if rate <= 0:
+            raise ValueError("spectator rate must be above 0")
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.historySize = historySize
+        self.history = OrderedDict()
+        self.seq = 0
+        self.lastSent = 0
+        self.clients = []
+        self.stopping = False
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.error = None
+        self.ready = threading.Event()
+
+    def get_port(self):
+        '''SpectatorServer.get_port() -> int
+        returns the port the server is listening on'''
+        return self.port
+
+    def get_client_count(self):
+        '''SpectatorServer.get_client_count() -> int
+        returns how many spectators are connected'''
+        return len(self.clients)
+
+    def start(self):
+        '''SpectatorServer.start() -> None
+        starts the server in a background thread
+        raises the error if the server could not start listening'''
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        if self.error != None:
+            self.thread.join()
+            raise self.error
+
+    def run(self):
+        '''SpectatorServer.run() -> None
+        runs the event loop of the server'''
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(asyncio.start_server(self.handle_client, self.host, self.port))
+            self.port = self.server.sockets[0].getsockname()[1]
+        except OSError as error:
+            # handed to start() in the main thread
+            self.error = error
+            self.loop.close()
+            return
+        finally:
+            self.ready.set()
+        self.loop.run_forever()
+
+        # hang up on everyone after stop
+        self.server.close()
+        self.stopping = True
+        for client in self.clients:
+            client["writer"].transport.abort()
+            client["waiting"].set()
+        self.loop.run_until_complete(asyncio.gather(*asyncio.all_tasks(self.loop), return_exceptions=True))
+        self.loop.close()
+
+    def stop(self):
+        '''SpectatorServer.stop() -> None
+        stops the server'''
+        if self.loop != None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+
+    def is_due(self, now):
+        '''SpectatorServer.is_due(now) -> bool
+        returns whether it is time to send another snapshot at time now in seconds'''
+        return now-self.lastSent >= 1/self.rate
+
+    def publish(self, snapshot, now):
+        '''SpectatorServer.publish(snapshot, now) -> None
+        hands snapshot to the server at time now without waiting on any spectator'''
+        self.lastSent = now
+        self.loop.call_soon_threadsafe(self.add_snapshot, snapshot)
+
+    def add_snapshot(self, snapshot):
+        '''SpectatorServer.add_snapshot(snapshot) -> None
+        stores snapshot and wakes up the spectators (runs in the server thread)'''
+        self.seq += 1
+        self.history[self.seq] = flatten(snapshot)
+        if len(self.history) > self.historySize:
+            self.history.popitem(last=False)
+
+        for client in self.clients:
+            client["waiting"].set()
+
+    async def read_acks(self, reader, client):
+        '''SpectatorServer.read_acks(reader, client) -> None
+        keeps track of the last snapshot the spectator has'''
+        try:
+            while True:
+                client["acked"] = ACK.unpack(await reader.readexactly(ACK.size))[0]
+                client["waiting"].set()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            # wake the sender so it can hang up
+            client["waiting"].set()
+
+    async def handle_client(self, reader, writer):
+        '''SpectatorServer.handle_client(reader, writer) -> None
+        sends the newest snapshots to a spectator as fast as it takes them
+        only one snapshot is sent at a time, the next one waits for its ack'''
+        client = {"waiting": asyncio.Event(), "acked": None, "writer": writer}
+        self.clients.append(client)
+        acks = asyncio.ensure_future(self.read_acks(reader, client))
+        sent = 0
+        if len(self.history) > 0:
+            client["waiting"].set()
+
+        try:
+            while not acks.done() and not self.stopping:
+                await client["waiting"].wait()
+                client["waiting"].clear()
+                if self.seq == sent or (sent != 0 and client["acked"] != sent):
+                    continue
+
+                # snapshots published while waiting for the ack are skipped, not queued
+                sent = self.seq
+                acked = client["acked"]
+                if acked in self.history:
+                    writer.write(encode_frame(sent, self.history[sent], acked, self.history[acked]))
+                else:
+                    writer.write(encode_frame(sent, self.history[sent]))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.remove(client)
+            acks.cancel()
+            writer.close()
+
+class SpectatorClient:
+    '''receives the state of a game from a spectator server'''
+
+    def __init__(self, historySize=64):
+        '''SpectatorClient(historySize) -> SpectatorClient
+        constructs the client'''
+        self.historySize = historySize
+        self.history = OrderedDict()
+        self.keyframes = 0
+        self.deltas = 0
+        self.reader = None
+        self.writer = None
+
+    async def connect(self, host, port):
+        '''SpectatorClient.connect(host, port) -> None
+        connects to the server at host and port'''
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+
+    def get_frame_counts(self):
+        '''SpectatorClient.get_frame_counts() -> tuple
+        returns how many keyframes and delta frames have been received'''
+        return self.keyframes, self.deltas
+
+    async def read_snapshot(self):
+        '''SpectatorClient.read_snapshot() -> tuple
+        returns the next snapshot from the server and acknowledges it'''
+        length = LENGTH.unpack(await self.reader.readexactly(LENGTH.size))[0]
+        frame = await self.reader.readexactly(length)
+        seq, flat = decode_frame(frame, self.history)
+        if frame[0] == KEYFRAME:
+            self.keyframes += 1
+        else:
+            self.deltas += 1
+
+        self.history[seq] = flat
+        if len(self.history) > self.historySize:
+            self.history.popitem(last=False)
+        self.writer.write(ACK.pack(seq))
+        return unflatten(flat)
+
+    def close(self):
+        '''SpectatorClient.close() -> None
+        closes the connection'''
+        if self.writer != None:
+            self.writer.close()
+
+class SpectatorViewer:
+    '''draws the game streamed from a spectator server'''
+
+    def __init__(self, client):
+        '''SpectatorViewer(client) -> SpectatorViewer
+        constructs the viewer for client'''
+        # imported here so the server does not need a display
+        import pygame
+        import targets as game
+        self.pygame = pygame
+        # the drawing code of the game, so the viewer looks the same
+        self.game = game
+
+        pygame.display.set_caption("Targets Spectator")
+        pygame.display.set_icon(pygame.image.load("logo.png"))
+        self.screen = pygame.display.set_mode((900, 700))
+        self.client = client
+        self.snapshot = None
+        self.sprites = game.TargetSprites("target2.png", "target_break1.png")
+        self.font = pygame.font.SysFont("Arial", 25, bold=True)
+
+        # images
+        self.background = pygame.image.load("background.png")
+        self.filter = pygame.image.load("gray_filter.png")
+        self.statbar = pygame.image.load("statbar.png")
+        self.lights = {color: pygame.image.load(f"light_{color}.png") for color in LIGHT_COLORS}
+
+    async def receive(self):
+        '''SpectatorViewer.receive() -> None
+        keeps the newest snapshot from the server'''
+        while True:
+            self.snapshot = await self.client.read_snapshot()
+
+    def draw(self):
+        '''SpectatorViewer.draw() -> None
+        draws the newest snapshot'''
+        self.screen.blit(self.background, (-1,-65))
+        if self.snapshot == None:
+            return
+        score, misses, crosshair, progress, lights, targets = self.snapshot
+
+        # targets
+        for pos, size, state in targets:
+            if state == "hidden":
+                continue
+            elif state == "breaking":
+                image = self.sprites.get_broken(size)
+            else:
+                image = self.sprites.get_target(size)[0]
+            self.screen.blit(image, (pos[0]-image.get_rect().width/2, pos[1]-image.get_rect().height/2))
+
+        # crosshair and laser
+        greyFilter = self.filter.copy()
+        self.game.draw_sights(greyFilter, crosshair, progress, self.game.LASER_COLOR)
+        self.screen.blit(greyFilter, (0,0))
+
+        # stat bar
+        surface = self.statbar.copy()
+        self.game.draw_lights(surface, self.game.get_lights_pos(surface), [self.lights[color] for color in lights])
+        self.game.draw_stat_text(surface, self.font, score, misses)
+        self.screen.blit(surface, (0,700-surface.get_rect().height))
+
+    async def mainloop(self):
+        '''SpectatorViewer.mainloop() -> None
+        draws the game until the window is closed'''
+        receiving = asyncio.ensure_future(self.receive())
+        while not receiving.done():
+            if any(event.type == self.pygame.QUIT for event in self.pygame.event.get()):
+                break
+            self.draw()
+            self.pygame.display.update()
+            await asyncio.sleep(1/60)
+
+        receiving.cancel()
+        self.client.close()
+
+async def check_loopback():
+    '''check_loopback() -> None
+    streams made up snapshots to a spectator over loopback and checks what arrives
+    raises RuntimeError if anything is wrong'''
+    def check(passed, message):
+        # not assert, so the check still runs with python -O
+        if not passed:
+            raise RuntimeError(f"loopback check failed: {message}")
+
+    server = SpectatorServer(port=0)
+    server.start()
+    client = SpectatorClient()
+    try:
+        await client.connect("127.0.0.1", server.get_port())
+        while server.get_client_count() == 0:
+            await asyncio.sleep(0.01)
+
+        # sizes whose ten thousandths do not survive a round trip through floats,
+        # each kept for two snapshots so deltas have to rely on the base
+        sizes = [(value+0.5)/10000 for value in range(1, 9000) if int(value/10000*10000) != value]
+        snapshots = []
+        for i in range(1, 51):
+            size = sizes[i//2]
+            lights = ("green",)*(i%10)+("red",)*(10-i%10)
+            snapshots.append((i*3, i%4, (450+i, 350), i*20%120, lights, (((400+i*1.5, 300+i), size, "visible"),)))
+
+        # keyframe then deltas
+        for snapshot in snapshots:
+            server.publish(snapshot, time.monotonic())
+            received = await client.read_snapshot()
+            check(received == unflatten(flatten(snapshot)), f"got {received} for {snapshot}")
+        check(client.get_frame_counts() == (1, len(snapshots)-1), f"got {client.get_frame_counts()} keyframes and deltas")
+
+        # a spectator that does not read gets at most the frame in flight and then the newest
+        for snapshot in reversed(snapshots):
+            server.publish(snapshot, time.monotonic())
+        await asyncio.sleep(0.2)
+        newest = unflatten(flatten(snapshots[0]))
+        if await client.read_snapshot() != newest:
+            check(await client.read_snapshot() == newest, "the newest snapshot did not arrive")
+        check(sum(client.get_frame_counts()) <= len(snapshots)+2, "snapshots were queued for a spectator that does not read")
+    finally:
+        client.close()
+        server.stop()
+
+async def watch(host, port):
+    '''watch(host, port) -> None
+    opens a viewer for the game served on host and port'''
+    client = SpectatorClient()
+    await client.connect(host, port)
+    await SpectatorViewer(client).mainloop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="watch a game of Targets")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--check", action="store_true", help="check streaming over loopback and exit")
+    args = parser.parse_args()
+
+    if args.check:
+        asyncio.run(check_loopback())
+        print("Loopback check passed")
+        raise SystemExit
+
+    import pygame
+    pygame.init()
+    asyncio.run(watch(args.host, args.port))
+    pygame.quit()
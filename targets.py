@@ -7,12 +7,68 @@
 # Sound effects from soundbible.com
 # Graphics made by G.G.Otto
 
-import pygame, random, time, math
+import pygame, random, time, math, argparse, heapq
 from pygame.locals import *
 import os.path as path
+from spectator import SpectatorServer
+from capture import GameCapture
+from particles import ParticleSystem
+
+LASER_COLOR = (0,255,0)
+
+# where the four guns sit around the crosshair
+GUN_OFFSETS = ((40*2**(1/2), 40*2**(1/2)), (40*2**(1/2),-40*2**(1/2)),
+    (-40*2**(1/2), 40*2**(1/2)), (-40*2**(1/2), -40*2**(1/2)))
+
+def get_gun_pos(pos):
+    '''get_gun_pos(pos) -> tuple
+    returns the positions of the guns around a crosshair at pos'''
+    return tuple((pos[0]+offset[0], pos[1]+offset[1]) for offset in GUN_OFFSETS)
+
+def draw_sights(surface, pos, progress, laserColor):
+    '''draw_sights(surface, pos, progress, laserColor) -> None
+    draws the crosshair at pos and its laser progress percent of the way in on the gray filter surface
+    (shared by the game and the spectator viewer)'''
+    pygame.draw.circle(surface, 0, pos, 80)
+
+    # laser from each gun towards the center
+    if progress > 0:
+        for gunPos in get_gun_pos(pos):
+            xslope = pos[0]-gunPos[0]
+            yslope = pos[1]-gunPos[1]
+            pygame.draw.line(surface, laserColor, gunPos, (gunPos[0]+xslope*progress/100, gunPos[1]+yslope*progress/100), 5)
+
+    pygame.draw.circle(surface, (0,0,0), pos, 80, 5)
+    pygame.draw.line(surface, (0,0,0), (pos[0], pos[1]-30), (pos[0], pos[1]+30))
+    pygame.draw.line(surface, (0,0,0), (pos[0]-30, pos[1]), (pos[0]+30, pos[1]))
+
+    # draw guns
+    for gunPos in get_gun_pos(pos):
+        pygame.draw.circle(surface, (0,0,0), gunPos, 5)
+
+def get_lights_pos(statbar):
+    '''get_lights_pos(statbar) -> tuple
+    returns where the row of lights goes on the statbar surface'''
+    return statbar.get_rect().width/2, 40
+
+def draw_lights(surface, pos, images):
+    '''draw_lights(surface, pos, images) -> None
+    draws the row of light images centered on pos'''
+    xpos = pos[0]-images[0].get_rect().width*len(images)/2
+    for image in images:
+        surface.blit(image, (xpos,pos[1]))
+        xpos += image.get_rect().width
+
+def draw_stat_text(surface, font, score, misses):
+    '''draw_stat_text(surface, font, score, misses) -> None
+    draws the score and misses on the statbar surface'''
+    score = font.render(f"Score: {score}", True, (180,180,180))
+    surface.blit(score, (20,50-score.get_rect().height/2))
+    misses = font.render(f"Missed: {misses}/3", True, (180,180,180))
+    surface.blit(misses, (880-misses.get_rect().width, 50-misses.get_rect().height/2))
 
 class TargetSound(pygame.mixer.Sound):
-    '''represents a sound object with attribute self.played and method self.is_playing'''
+    '''represents a sound object with attribute self.channel and method self.is_playable'''
 
     def __init__(self, file, volume, game):
         '''TargetSound(file, volume, game) -> TargetSound
@@ -22,6 +78,7 @@ class TargetSound(pygame.mixer.Sound):
         self.game = game
         self.game.add_sound(self)
         self.originVolume = volume
+        self.channel = None
         self.set_volume(volume)
 
     def is_playable(self):
@@ -29,14 +86,6 @@ class TargetSound(pygame.mixer.Sound):
         returns whether the target sound is playing or not'''
         return self.playable
 
-    def set_origin_volume(self, newVolume):
-        '''TargetSound.set_origin_volumne(newVolume) -> None
-        sets the original volume'''
-        self.originVolume = newVolume
-
-        if self.get_volume() != 0:
-            self.set_volume(newVolume)
-
     def set_playable(self, boolean):
         '''TargetSound.set_playable(boolean) -> None
         sets the playable the playable option'''
@@ -47,20 +96,231 @@ class TargetSound(pygame.mixer.Sound):
         restores the volume to its original state'''
         self.set_volume(self.originVolume)
 
+    def get_channel(self):
+        '''TargetSound.get_channel() -> Channel
+        returns the channel the sound is playing on, None if it is not playing'''
+        if self.channel != None and self.channel.get_sound() != self:
+            self.channel = None
+        return self.channel
+
     def play(self, loops=0):
         '''TargetSound.play(loops) -> None
         plays the sound'''
-        pygame.mixer.Sound.play(self, loops=loops)
-        self.played = time.time()
+        self.channel = pygame.mixer.Sound.play(self, loops=loops)
+
+class AudioScheduler:
+    '''sets the volume and pan of target noises on the mixer at a low rate'''
+
+    def __init__(self, width=900, rate=10, threshold=0.03, maxVoices=2):
+        '''AudioScheduler(width, rate, threshold, maxVoices) -> AudioScheduler
+        constructs the scheduler for a field width pixels wide
+        updates the mixer rate times a second when a volume changes by more than threshold
+        only the maxVoices biggest sounds are heard'''
+        self.width = width
+        self.rate = rate
+        self.threshold = threshold
+        self.maxVoices = maxVoices
+        self.requests = {}
+        self.applied = {}
+        self.lastApply = 0
+
+    def request(self, sound, volume, pos, priority):
+        '''AudioScheduler.request(sound, volume, pos, priority) -> None
+        asks for sound to be heard at volume from pos
+        sounds with a higher priority are heard first'''
+        pan = min(max(pos[0]/self.width, 0), 1)
+        self.requests[sound] = volume, pan, priority
+
+    def release(self, sound):
+        '''AudioScheduler.release(sound) -> None
+        stops scheduling sound'''
+        self.requests.pop(sound, None)
+        self.applied.pop(sound, None)
+
+    def clear(self):
+        '''AudioScheduler.clear() -> None
+        stops scheduling all sounds'''
+        self.requests = {}
+        self.applied = {}
+
+    def is_applied(self, sound):
+        '''AudioScheduler.is_applied(sound) -> bool
+        returns whether the volume of sound has been set on the channel it plays on'''
+        return sound in self.applied and self.applied[sound][0] == sound.get_channel()
+
+    def update(self, now):
+        '''AudioScheduler.update(now) -> None
+        applies the requested volumes if it is time to at time now
+        sounds that just started on a channel are applied right away,
+        since playing resets the channel to full volume'''
+        due = now-self.lastApply >= 1/self.rate
+        if not due and all(self.is_applied(sound) for sound in self.requests):
+            return
+        if due:
+            self.lastApply = now
+
+        ranked = sorted(self.requests.items(), key=lambda request: request[1][2], reverse=True)
+        for voice, (sound, (volume, pan, priority)) in enumerate(ranked):
+            channel = sound.get_channel()
+            if channel == None or (not due and self.is_applied(sound)):
+                continue
+
+            # too many voices
+            if voice >= self.maxVoices:
+                volume = 0
+
+            # constant power pan
+            left = volume*math.cos(pan*math.pi/2)
+            right = volume*math.sin(pan*math.pi/2)
+
+            # only touch the mixer for a big enough change
+            if sound in self.applied:
+                lastChannel, lastLeft, lastRight = self.applied[sound]
+                if lastChannel == channel and abs(left-lastLeft) <= self.threshold and abs(right-lastRight) <= self.threshold:
+                    continue
+            channel.set_volume(left, right)
+            self.applied[sound] = channel, left, right
+
+class Timers:
+    '''runs callbacks when their time comes, reading the clock once a tick'''
+
+    def __init__(self):
+        '''Timers() -> Timers
+        constructs the timer queue'''
+        self.now = time.monotonic()
+        self.queue = []
+        self.count = 0
+
+    def get_time(self):
+        '''Timers.get_time() -> float
+        returns the time of the current tick'''
+        return self.now
+
+    def call_later(self, delay, callback):
+        '''Timers.call_later(delay, callback) -> list
+        calls callback delay seconds after the current tick
+        returns the timer to cancel it with'''
+        # the count keeps timers with the same time in order
+        self.count += 1
+        timer = [self.now+delay, self.count, callback]
+        heapq.heappush(self.queue, timer)
+        return timer
+
+    def cancel(self, timer):
+        '''Timers.cancel(timer) -> None
+        stops timer from being called'''
+        if timer != None:
+            timer[2] = None
+
+    def clear(self):
+        '''Timers.clear() -> None
+        cancels all timers'''
+        self.queue = []
+
+    def tick(self):
+        '''Timers.tick() -> None
+        reads the clock and calls every timer that is due'''
+        self.now = time.monotonic()
+        while len(self.queue) > 0 and self.queue[0][0] <= self.now:
+            callback = heapq.heappop(self.queue)[2]
+            if callback != None:
+                callback()
+
+class TargetSprites:
+    '''caches the scaled target images and collision masks for each quantized scale'''
+
+    def __init__(self, file, breakFile, scaleStep=0.01):
+        '''TargetSprites(file, breakFile, scaleStep) -> TargetSprites
+        constructs the sprite cache for the target image file and break image breakFile'''
+        self.origin = pygame.image.load(file)
+        self.breakOrigin = pygame.image.load(breakFile)
+        self.scaleStep = scaleStep
+        self.scaled = {}
+        self.broken = {}
+        self.ringMap = self.find_rings()
+
+    def find_rings(self):
+        '''TargetSprites.find_rings() -> bytearray
+        returns the ring index for every radius of the original image'''
+        width, height = self.origin.get_size()
+        center = width//2, height//2
+
+        # runs of color going out from the center
+        runs = []
+        for radius in range(min(center)):
+            color = self.origin.get_at((center[0]+radius, center[1]))
+            if color.a < 128:
+                break
+            if len(runs) > 0 and runs[-1][0] == color:
+                runs[-1][1] += 1
+            else:
+                runs.append([color, 1])
+
+        # antialiased edges are too thin to be rings of their own
+        ringMap = bytearray()
+        ring = 0
+        ringColor = runs[0][0]
+        for color, length in runs:
+            if length >= 3 and color != ringColor:
+                ring += 1
+                ringColor = color
+            ringMap.extend([ring]*length)
+
+        return ringMap
+
+    def get_scale(self, size):
+        '''TargetSprites.get_scale(size) -> float
+        returns size quantized to the cache step'''
+        return max(1, round(size/self.scaleStep))*self.scaleStep
+
+    def get_target(self, size):
+        '''TargetSprites.get_target(size) -> tuple
+        returns the image and collision mask of the target at size'''
+        key = max(1, round(size/self.scaleStep))
+        if key not in self.scaled:
+            image = pygame.transform.rotozoom(self.origin, 0, key*self.scaleStep)
+            self.scaled[key] = image, pygame.mask.from_surface(image)
+        return self.scaled[key]
+
+    def get_broken(self, size):
+        '''TargetSprites.get_broken(size) -> Surface
+        returns the image of the broken target at size'''
+        key = max(1, round(size/self.scaleStep))
+        if key not in self.broken:
+            self.broken[key] = pygame.transform.rotozoom(self.breakOrigin, 0, key*self.scaleStep)
+        return self.broken[key]
+
+    def get_ring(self, size, offset):
+        '''TargetSprites.get_ring(size, offset) -> int
+        returns the ring at offset from the center of the target at size
+        returns None if offset is not on the target'''
+        mask = self.get_target(size)[1]
+        width, height = mask.get_size()
+        x, y = int(offset[0]+width/2), int(offset[1]+height/2)
+        if not (0 <= x < width and 0 <= y < height) or not mask.get_at((x, y)):
+            return None
+
+        radius = int((offset[0]**2+offset[1]**2)**(1/2)/self.get_scale(size))
+        if radius >= len(self.ringMap):
+            return self.ringMap[-1]
+        return self.ringMap[radius]
 
 class Target:
     '''moves and manipulates the target'''
 
+    __slots__ = ("breakingSound", "missSound", "spawnSound", "noise", "game", "pos", "size", "speed", "dir",
+        "hidden", "breaking", "hitWorth", "spawnTimer", "showTimer", "breakTimer")
+
+    # shared between all targets so scaling only happens once
+    sprites = None
+    ringWorth = (10, 8, 6, 4, 2, 1)
+
     def __init__(self, game, pos, size):
         '''Target(game, pos, size) -> Target
         constructs the target for game as pos with size'''
         # image and sounds
-        self.origin = pygame.image.load("target2.png")
+        if Target.sprites == None:
+            Target.sprites = TargetSprites("target2.png", "target_break1.png")
         self.breakingSound = TargetSound("breaking.wav", 0.55, game)
         self.missSound = TargetSound("miss.wav", 0.4, game)
         self.spawnSound = TargetSound("target_spawn.wav", 0.55, game)
@@ -71,24 +331,54 @@ class Target:
         self.pos = pos
         self.size = 0
         self.speed = 1.5
-        self.hideTime = 0
-        self.hideWait = 0
+        self.hidden = False
         self.breaking = False
+        self.hitWorth = 0
+        self.spawnTimer = None
+        self.showTimer = None
+        self.breakTimer = None
         self.randomize()
 
     def is_hit(self, pos):
         '''Target.is_hit(pos) -> bool
         returns if the target has been hit or not'''
-        return not self.breaking and ((self.pos[0]-pos[0])**2+(self.pos[1]-pos[1])**2)**(1/2) < 42*self.size
+        return self.get_ring(pos) != None
+
+    def get_ring(self, pos):
+        '''Target.get_ring(pos) -> int
+        returns the ring of the target at pos, None if pos misses the target'''
+        if self.breaking or self.size <= 0 or self.is_hidden():
+            return None
+        return Target.sprites.get_ring(self.size, (pos[0]-self.pos[0], pos[1]-self.pos[1]))
+
+    def get_ring_worth(self, ring):
+        '''Target.get_ring_worth(ring) -> int
+        returns how much a hit on ring is worth'''
+        return self.ringWorth[min(ring, len(self.ringWorth)-1)]
+
+    def is_hidden(self):
+        '''Target.is_hidden() -> bool
+        returns if the target is waiting to respawn'''
+        return self.hidden
+
+    def get_snapshot(self):
+        '''Target.get_snapshot() -> tuple
+        returns the position, size and state of the target'''
+        if self.breaking:
+            return self.pos, self.size, "breaking"
+        elif self.is_hidden():
+            return self.pos, self.size, "hidden"
+        return self.pos, self.size, "visible"
 
     def is_off(self):
         '''Target.is_off() -> bool
         returns if the target is off screen or not'''
         return not -80 < self.pos[0] < 980 or not -80 < self.pos[1] < 700 or self.size > 0.8
 
-    def get_worth(self):
-        '''Target.get_worth() -> int
-        returns how much the target is worth'''
+    def get_distance_level(self):
+        '''Target.get_distance_level() -> int
+        returns how far away the target looks for the light bar,
+        from 10 when it spawns down to 0 when it is about to fly past'''
         return int(10-self.size//0.08)
 
     def add_speed(self, plusSpeed):
@@ -100,64 +390,78 @@ class Target:
     def randomize(self, wait=0):
         '''Target.randomize(wait=0) -> None
         randomizes the target'''
-        self.hideWait = time.time()
-        self.hideTime = wait/1000
-        
+        # wait to show up again
+        timers = self.game.get_timers()
+        timers.cancel(self.spawnTimer)
+        timers.cancel(self.showTimer)
+        self.hidden = wait > 0
+        if self.hidden:
+            self.spawnTimer = timers.call_later(wait/1000-0.2, self.play_spawn)
+            self.showTimer = timers.call_later(wait/1000, self.show)
+
         self.pos = random.randint(400,500), random.randint(300,400)
         self.size = random.randint(0,10)/100
         self.dir = random.randrange(360)
-        self.spawnSound.set_playable(True)
         self.noise.stop()
         self.noise.set_playable(True)
+        self.game.get_audio().release(self.noise)
 
-    def break_to_pieces(self):
-        '''Target.break_to_pieces() -> None
-        breaks the target'''
-        self.breakingSound.set_playable(True)
+    def break_to_pieces(self, worth):
+        '''Target.break_to_pieces(worth) -> None
+        breaks the target that was hit for worth'''
+        self.hitWorth = worth
+        self.breakingSound.play()
         self.breaking = True
-        self.breakTime = time.time()
+        self.breakTimer = self.game.get_timers().call_later(0.4, self.end_break)
+        self.game.get_particles().shatter(Target.sprites.get_target(self.size)[0], self.pos)
             
+    def play_spawn(self):
+        '''Target.play_spawn() -> None
+        plays the spawn sound just before the target shows up'''
+        if not self.game.is_over():
+            self.spawnSound.play()
+
+    def show(self):
+        '''Target.show() -> None
+        shows the target after waiting'''
+        self.hidden = False
+
+    def end_break(self):
+        '''Target.end_break() -> None
+        finishes breaking and sends the target back'''
+        if self.game.is_over():
+            return
+        self.breaking = False
+        self.game.add_bubble(NumberBubble(self.game.get_screen(), self.game.get_timers(), self.pos, self.hitWorth, 5))
+        self.randomize(1500)
+
     def update(self):
         '''Target.update() -> None
         updates the whole target'''
         if self.game.is_over():
             return
-        
-        if self.breaking:
-            timing = time.time()-self.breakTime
-            
-            # crack sound
-            if self.breakingSound.is_playable() and timing < 0.2:
-                self.breakingSound.set_playable(False)
-                self.breakingSound.play()
-
-            # crack image
-            if timing < 0.4:
-                image = pygame.transform.rotozoom(pygame.image.load("target_break1.png"), 0, self.size)
-            else:
-                self.breaking = False
-                self.game.add_bubble(NumberBubble(self.game.get_screen(), self.pos, self.get_worth(), 5))
-                self.randomize(1500)
 
-        if time.time() - self.hideWait > self.hideTime:
+        if not self.hidden:
             # grow and move
             if not self.breaking:
                 self.size += 0.003*(self.speed-0.5)
                 self.pos = self.pos[0]+self.speed*math.cos(self.dir), self.pos[1]+self.speed*math.sin(self.dir)
-                image = pygame.transform.rotozoom(self.origin, 0, self.size)
-            self.game.get_screen().blit(image, (self.pos[0]-image.get_rect().width/2, self.pos[1]-image.get_rect().height/2))
+                image = Target.sprites.get_target(self.size)[0]
+
+            # crack image when there are no particles to show
+            elif not self.game.get_particles().is_enabled():
+                image = Target.sprites.get_broken(self.size)
+            else:
+                image = None
+
+            if image != None:
+                self.game.get_screen().blit(image, (self.pos[0]-image.get_rect().width/2, self.pos[1]-image.get_rect().height/2))
 
             # target noise
             if self.noise.is_playable():
                 self.noise.play(loops=2)
                 self.noise.set_playable(False)
-            self.noise.set_origin_volume(self.size/2+0.2)
-
-        # spawn sound
-        elif time.time() - self.hideWait > self.hideTime - 0.2:
-            if self.spawnSound.is_playable():
-                self.spawnSound.play()
-                self.spawnSound.set_playable(False)
+            self.game.get_audio().request(self.noise, self.size/2+0.2, self.pos, self.size)
 
         if self.is_off():
             self.game.get_stats().get_lights().flash("red", 8, 0.2)
@@ -171,6 +475,8 @@ class Target:
 class Crosshair:
     '''represents the crosshair view for gun sights'''
 
+    __slots__ = ("game", "pos", "directions", "moving", "laser")
+
     def __init__(self, game):
         '''Crosshair(game) -> Crosshair
         constructs the crosshair with game and size'''
@@ -180,25 +486,25 @@ class Crosshair:
         # directions for event types
         speed = 9
         self.directions = {K_UP: (0,-speed), K_DOWN: (0,speed), K_LEFT: (-speed, 0), K_RIGHT: (speed, 0)}
-        self.gunPos = ((40*2**(1/2), 40*2**(1/2)), (40*2**(1/2),-40*2**(1/2)),
-            (-40*2**(1/2), 40*2**(1/2)), (-40*2**(1/2), -40*2**(1/2)))
         self.moving = []
 
-        self.laser = Laser(self, (0,255,0))
+        self.laser = Laser(self, LASER_COLOR)
 
     def get_gun_pos(self):
         '''Crosshair.get_gun_pos() -> tuple
         returns the positions of the guns'''
-        output = []
-        for gunPos in self.gunPos:
-            output.append((self.pos[0]+gunPos[0], self.pos[1]+gunPos[1]))
-        return tuple(output)
+        return get_gun_pos(self.pos)
 
     def get_pos(self):
         '''Crosshair.get_pos() -> None
         returns the position of the crosshair'''
         return self.pos
 
+    def get_laser(self):
+        '''Crosshair.get_laser() -> Laser
+        returns the laser of the crosshair'''
+        return self.laser
+
     def set_pos(self, pos):
         '''Crosshair.set_pos(pos) -> None
         sets the postion of the crosshair'''
@@ -224,11 +530,13 @@ class Crosshair:
         '''Crosshair.check_shot() -> bool
         returns if hit is true and checks if the shot has hit a target'''
         for target in self.game.get_targets():
-            if target.is_hit(self.pos):
+            ring = target.get_ring(self.pos)
+            if ring != None:
+                worth = target.get_ring_worth(ring)
                 self.game.get_stats().get_lights().flash("green", 8, 0.2)
-                target.break_to_pieces()
+                target.break_to_pieces(worth)
                 target.add_speed(0.135)
-                self.game.get_stats().add_hit(target.get_worth())
+                self.game.get_stats().add_hit(worth)
                 return True
             
         self.game.get_stats().get_lights().flash("yellow", 8, 0.2)
@@ -269,23 +577,18 @@ class Crosshair:
             if not self.laser.is_running() and 20 <= self.pos[0]+move[0] <= 880 and 20 < self.pos[1]+move[1] < 605:
                self.pos = self.pos[0]+move[0], self.pos[1]+move[1]
 
-        greyFilter = pygame.image.load("gray_filter.png")
+        self.laser.update()
+
         # draw crosshair
-        pygame.draw.circle(greyFilter, 0, self.pos, 80)
-        self.laser.update(greyFilter)
-        pygame.draw.circle(greyFilter, (0,0,0), self.pos, 80, 5)
-        pygame.draw.line(greyFilter, (0,0,0), (self.pos[0], self.pos[1]-30), (self.pos[0], self.pos[1]+30))
-        pygame.draw.line(greyFilter, (0,0,0), (self.pos[0]-30, self.pos[1]), (self.pos[0]+30, self.pos[1]))
-
-        # draw guns
-        for pos in self.get_gun_pos():
-            pygame.draw.circle(greyFilter, (0,0,0), pos, 5)
-        
+        greyFilter = pygame.image.load("gray_filter.png")
+        draw_sights(greyFilter, self.pos, self.laser.get_progress(), self.laser.get_color())
         self.game.get_screen().blit(greyFilter, (0,0))
         
 class Laser:
     '''represents the laser for the gun'''
 
+    __slots__ = ("crosshair", "color", "running", "checked", "hit", "progress", "endTimer", "laserSound")
+
     def __init__(self, crosshair, color):
         '''Laser(crosshair, color) -> Laser
         creates a laser for crosshair with color'''
@@ -295,6 +598,7 @@ class Laser:
         self.checked = False
         self.hit = False
         self.progress = 0
+        self.endTimer = None
 
         # sound for laser
         self.laserSound = TargetSound("laser.wav", 0.4, crosshair.get_game())
@@ -304,6 +608,18 @@ class Laser:
         returns if the laser if firing or not'''
         return self.running
 
+    def get_color(self):
+        '''Laser.get_color() -> tuple
+        returns the color of the laser'''
+        return self.color
+
+    def get_progress(self):
+        '''Laser.get_progress() -> int
+        returns how far the laser has gone in percent'''
+        if not self.running:
+            return 0
+        return self.progress
+
     def fire(self):
         '''Laser.fire() -> None
         fires the laser'''
@@ -314,11 +630,15 @@ class Laser:
     def stop_shooting(self):
         '''Laser.stop_shooting() -> None
         stops the laser while shooting'''
+        self.crosshair.get_game().get_timers().cancel(self.endTimer)
         self.running = False
+        self.endTimer = None
+        self.checked = False
+        self.hit = False
 
-    def update(self, surface):
-        '''Laser.update(surface) -> None
-        updates the laser on surface'''
+    def update(self):
+        '''Laser.update() -> None
+        updates the laser, the crosshair draws it'''
         if not self.running:
             return
 
@@ -329,29 +649,18 @@ class Laser:
                 self.laserSound.play()
                 
             self.progress += 20
-            self.endTime = time.time()
-            
-        elif self.endTime != None and (time.time() - self.endTime > 1 or \
-            (self.hit and time.time() - self.endTime > 0.3)):
-            self.running = False
-            self.endTime = None
-            self.checked = False
-            self.hit = False
             
+        # stays on screen for a bit after the shot
         elif not self.checked:
             self.checked = True
-            self.hit = self.crosshair.check_shot()            
-            
-        for pos in self.crosshair.get_gun_pos():
-            # distance on axises to crosshair
-            crosshair = self.crosshair.get_pos()
-            xslope = crosshair[0]-pos[0]
-            yslope = crosshair[1]-pos[1]            
-            pygame.draw.line(surface, self.color, pos, (pos[0]+xslope*self.progress/100, pos[1]+yslope*self.progress/100), 5)
+            self.hit = self.crosshair.check_shot()
+            self.endTimer = self.crosshair.get_game().get_timers().call_later(0.3 if self.hit else 1, self.stop_shooting)
 
 class Stats:
     '''represents all of the stats for the game'''
 
+    __slots__ = ("surface", "game", "lights", "font", "score", "misses")
+
     def __init__(self, game):
         '''Stats(game) -> Stats
         constructs the stat bar'''
@@ -359,7 +668,7 @@ class Stats:
         self.game = game
 
         # stat components
-        self.lights = Lights(self.surface, (self.surface.get_rect().width/2, 40), 10)
+        self.lights = Lights(self.surface, game.get_timers(), get_lights_pos(self.surface), 10)
         self.font = pygame.font.SysFont("Arial", 25, bold=True)
 
         self.score = 0
@@ -375,6 +684,11 @@ class Stats:
         returns the score'''
         return self.score
 
+    def get_misses(self):
+        '''Stats.get_misses() -> int
+        returns the number of misses'''
+        return self.misses
+
     def add_miss(self):
         '''Stats.add_miss() -> None
         adds a miss to the stat bar'''
@@ -405,10 +719,7 @@ class Stats:
         self.lights.update()
 
         # update text
-        score = self.font.render(f"Score: {self.score}", True, (180,180,180))
-        self.surface.blit(score, (20,50-score.get_rect().height/2))
-        misses = self.font.render(f"Missed: {self.misses}/3", True, (180,180,180))
-        self.surface.blit(misses, (880-misses.get_rect().width, 50-misses.get_rect().height/2))
+        draw_stat_text(self.surface, self.font, self.score, self.misses)
 
         # sound indicator
         if self.game.is_playing_sound():
@@ -421,22 +732,31 @@ class Stats:
 class Lights:
     '''represents the row of light indicators'''
 
-    def __init__(self, surface, pos, numLights):
-        '''Lights(surface, pos, numLights) -> Lights
-        constructs the row of lights'''
+    __slots__ = ("lights", "colors", "pos", "surface", "timers", "animations", "finished", "animationCount", "stepTimer")
+
+    def __init__(self, surface, timers, pos, numLights):
+        '''Lights(surface, timers, pos, numLights) -> Lights
+        constructs the row of lights animated with timers'''
         self.lights = [pygame.image.load("light_black.png") for i in range(numLights)]
+        self.colors = ["black"]*numLights
         self.pos = pos
         self.surface = surface
+        self.timers = timers
         self.animations = None
         self.finished = []
         self.animationCount = 0
-        self.animationTime = 0
+        self.stepTimer = None
 
     def is_finished(self, animationId):
         '''Lights.is_finished(animationId) -> bool
         returns whether animation is finished or not'''
         return animationId in self.finished
 
+    def get_colors(self):
+        '''Lights.get_colors() -> tuple
+        returns the color of each light'''
+        return tuple(self.colors)
+
     def is_animation(self):
         '''Lights.is_animation() -> bool
         returns if lights are animating'''
@@ -445,7 +765,9 @@ class Lights:
     def stop(self, clear=True):
         '''Lights.stop(clear) -> None
         stops all animations'''
+        self.timers.cancel(self.stepTimer)
         self.animations = None
+        self.stepTimer = None
         if clear:
             self.light("all", "black")
 
@@ -466,6 +788,7 @@ class Lights:
             
         for light in range(lights[0], lights[1]):
             self.lights[light] = pygame.image.load(f"light_{color}.png")
+            self.colors[light] = color
 
     def flash(self, color, flashAmt=6, speed=0.5):
         '''Lights.flash(color, flashAmt) -> int
@@ -488,55 +811,66 @@ class Lights:
         # if already animating
         if self.animations != None:
             self.finished.append(self.animations[1])
+            self.timers.cancel(self.stepTimer)
             
         self.animationCount += 1
-        self.animations = [list(animate), self.animationCount, time.time()]
-        self.animationTime = animate[0][-1]
+        self.animations = [list(animate), self.animationCount]
+        self.stepTimer = self.timers.call_later(animate[0][-1], self.step)
         return self.animationCount
 
+    def step(self):
+        '''Lights.step() -> None
+        shows the next step of the animation'''
+        # light lights
+        step = self.animations[0].pop(0)
+        for light in step[:-1]:
+            light = light.split(", ")
+            self.light(light[0], light[1])
+
+        # end flash
+        if len(self.animations[0]) == 0:
+            self.finished.append(self.animations[1])
+            self.animations = None
+            self.stepTimer = None
+        else:
+            self.stepTimer = self.timers.call_later(step[-1], self.step)
+
     def update(self):
         '''Lights.update() -> None
         updates the row of lights'''
-        # deal with flash
-        if self.animations != None:
-            if time.time()-self.animations[-1] > self.animationTime:
-                # light lights
-                for light in self.animations[0][0][:-1]:
-                    light = light.split(", ")
-                    self.light(light[0], light[1])
-                self.animations[-1] = time.time()
-                self.animationTime = self.animations[0][0][-1]
-                self.animations[0].pop(0)
-
-                # end flash
-                if len(self.animations[0]) == 0:
-                    self.finished.append(self.animations[1])
-                    self.animations = None
-                        
-        xpos = self.pos[0]-self.lights[0].get_rect().width*len(self.lights)/2
-        for light in self.lights:
-            self.surface.blit(light, (xpos,self.pos[1]))
-            xpos += light.get_rect().width
+        draw_lights(self.surface, self.pos, self.lights)
 
 class NumberBubble:
     '''number bubble that rises and then fades'''
 
-    def __init__(self, surface, pos, number, timeToFade):
-        '''NumberBubble(surface, pos, number, timeToFade) -> NumberBubble
+    __slots__ = ("surface", "timers", "pos", "timeToFade", "start", "number", "radius", "kill", "font", "bubbleList")
+
+    def __init__(self, surface, timers, pos, number, timeToFade):
+        '''NumberBubble(surface, timers, pos, number, timeToFade) -> NumberBubble
         constructs the number bubble on surface at pos with number'''
         self.surface = surface
+        self.timers = timers
         self.pos = pos
         self.timeToFade = timeToFade
-        self.start = time.time()
+        self.start = timers.get_time()
         self.number = number
         self.radius = 40
         self.kill = False
         self.font = pygame.font.SysFont("Arial", 43)
+        self.bubbleList = None
+        timers.call_later(timeToFade, self.expire)
 
     def set_bubble_list(self, bubbleList):
         '''NumberBubble.set_bubble_list(bubbleList) -> None
         sets the bubbleList to bubbleList'''
         self.bubbleList = bubbleList
+
+    def expire(self):
+        '''NumberBubble.expire() -> None
+        removes the number bubble once it has faded'''
+        if self.bubbleList != None and self in self.bubbleList:
+            self.bubbleList.remove(self)
+        self.kill = True
         
     def update(self):
         '''NumberBubble.update() -> None
@@ -545,24 +879,25 @@ class NumberBubble:
             return
 
         self.pos = self.pos[0], self.pos[1]-2
-        grey = ((time.time()-self.start)/self.timeToFade)*200
+        grey = ((self.timers.get_time()-self.start)/self.timeToFade)*200
         if grey > 255:
             grey = 255
             
         pygame.draw.circle(self.surface, (grey,grey,grey), self.pos, self.radius, 4)
         text = self.font.render("+"+str(self.number), True, (grey,grey,grey))
         self.surface.blit(text, (self.pos[0]-text.get_rect().width/2, self.pos[1]-text.get_rect().height/2))
-
-        if time.time()-self.start > self.timeToFade:
-            self.bubbleList.remove(self)
-            self.kill = True    
         
 class TargetsGame:
     '''represents the game for targets'''
 
-    def __init__(self):
-        '''TargetsGame() -> TargetsGame
-        constructs the game of targets'''
+    def __init__(self, spectatorPort=None, spectatorRate=15, captureOutput=None, captureMode="raw", captureRate=30,
+        effectQuality=1, maxParticles=4000):
+        '''TargetsGame(spectatorPort, spectatorRate, captureOutput, captureMode, captureRate,
+            effectQuality, maxParticles) -> TargetsGame
+        constructs the game of targets
+        streams spectatorRate snapshots a second to spectators if spectatorPort is given
+        records captureRate frames a second to captureOutput if it is given
+        effectQuality (0 to 1) and maxParticles limit the particle effects'''
         # set up display
         pygame.display.set_caption("Targets")
         pygame.display.set_icon(pygame.image.load("logo.png"))
@@ -570,14 +905,18 @@ class TargetsGame:
         self.sounds = []
 
         # setup game objects and attributes
+        self.timers = Timers()
+        self.particles = ParticleSystem(maxParticles, effectQuality)
+        self.audio = AudioScheduler()
         self.targets = [Target(self, (0,0), 0.5)]
         self.crosshair = Crosshair(self)
         self.stats = Stats(self)
         self.beep = TargetSound("beep3.wav", 0.3, self)
         self.bubbles = []
-        self.finalEnd = None
         self.gameOver = False
-        self.lastLight = self.targets[0].get_worth()
+        self.ended = False
+        self.newHigh = False
+        self.lastLight = self.targets[0].get_distance_level()
         self.highScore = self.get_high_score()
 
         # sound track
@@ -588,8 +927,35 @@ class TargetsGame:
         if not self.sound:
             for sound in self.sounds:
                 sound.set_volume(0)
+        # spectators
+        self.spectators = None
+        if spectatorPort != None:
+            try:
+                self.spectators = SpectatorServer("127.0.0.1", spectatorPort, spectatorRate)
+                self.spectators.start()
+            except (OSError, ValueError) as error:
+                print(f"Could not stream the game: {error}")
+                self.spectators = None
+
+        # recording
+        self.capture = None
+        if captureOutput != None:
+            try:
+                self.capture = GameCapture(self.screen, captureOutput, captureMode, captureRate)
+                self.capture.start()
+            except (OSError, ValueError) as error:
+                print(f"Could not record the game: {error}")
+                self.capture = None
+
         # start game
         self.mainloop()
+        if self.spectators != None:
+            self.spectators.stop()
+        if self.capture != None:
+            self.capture.stop()
+            print(f"Captured {self.capture.get_captured()} frames, wrote {self.capture.get_written()}, dropped {self.capture.get_dropped()}")
+            if self.capture.get_error() != None:
+                print(f"Recording stopped early: {self.capture.get_error()}")
         pygame.quit()
 
     def get_screen(self):
@@ -607,11 +973,33 @@ class TargetsGame:
         returns the stat bar'''
         return self.stats
 
+    def get_timers(self):
+        '''TargetsGame.get_timers() -> Timers
+        returns the timers for the game'''
+        return self.timers
+
+    def get_particles(self):
+        '''TargetsGame.get_particles() -> ParticleSystem
+        returns the particle system'''
+        return self.particles
+
+    def get_audio(self):
+        '''TargetsGame.get_audio() -> AudioScheduler
+        returns the scheduler for target noises'''
+        return self.audio
+
     def get_crosshair(self):
         '''TargetsGame.get_crosshair() -> Crosshair
         returns the crosshair'''
         return self.crosshair
 
+    def get_snapshot(self):
+        '''TargetsGame.get_snapshot() -> tuple
+        returns the state of the game for spectators'''
+        return (self.stats.get_score(), self.stats.get_misses(), self.crosshair.get_pos(),
+            self.crosshair.get_laser().get_progress(), self.stats.get_lights().get_colors(),
+            tuple(target.get_snapshot() for target in self.targets))
+
     def is_over(self):
         '''TargetsGame.is_over() -> bool
         returns if the game is over or not'''
@@ -636,13 +1024,17 @@ class TargetsGame:
     def update(self):
         '''TargetsGame.update() -> None
         updates a single frame of the game'''
+        self.timers.tick()
+
         # update all
         if self.started:
             for bubble in self.bubbles[:]:
                 bubble.update()
             for target in self.targets:
                 target.update()
+            self.particles.update(self.screen, self.timers.get_time())
             self.crosshair.update()
+            self.audio.update(self.timers.get_time())
 
         # update stats
         self.stats.update()
@@ -650,40 +1042,53 @@ class TargetsGame:
             self.stats.add_high(self.highScore)
 
         # end game
-        if self.finalEnd != None and time.time() - self.finalEnd > 2:
-            self.started = False
+        if self.ended:
             self.screen.blit(pygame.image.load("end.png"), (0,0))
-            self.stats.get_lights().stop()
-
-            if self.stats.get_score() > self.highScore:
-                self.highScore = self.stats.get_score()
-                self.save_high_score(self.stats.get_score())
+            if self.newHigh:
+                self.newHigh = False
                 self.screen.blit(pygame.image.load("high.png"), (0,0))
 
         # light indicator
-        if self.started and not self.stats.get_lights().is_animation() and self.finalEnd == None:
+        if self.started and not self.stats.get_lights().is_animation() and not self.gameOver:
             self.stats.get_lights().light("all", "red")
-            self.stats.get_lights().light((10-self.targets[0].get_worth(),10), "green")
+            self.stats.get_lights().light((10-self.targets[0].get_distance_level(),10), "green")
 
         # play sound
-        if self.lastLight != self.targets[0].get_worth():
+        if self.lastLight != self.targets[0].get_distance_level():
             self.beep.play()
-        self.lastLight = self.targets[0].get_worth()
+        self.lastLight = self.targets[0].get_distance_level()
                 
     def end_game(self):
         '''Target.end_game() -> None
         ends the game when called'''
         self.gameOver = True
-        self.finalEnd = time.time()
+        self.timers.call_later(2, self.show_end)
         self.soundTrack.fadeout(5000)
 
+    def show_end(self):
+        '''TargetsGame.show_end() -> None
+        shows the end screen a little after the game ends'''
+        self.started = False
+        self.ended = True
+        self.stats.get_lights().stop()
+
+        if self.stats.get_score() > self.highScore:
+            self.highScore = self.stats.get_score()
+            self.save_high_score(self.stats.get_score())
+            self.newHigh = True
+
     def restart(self):
         '''Target.restart() -> None
         restarts the game'''
         self.sounds = [self.soundTrack, self.beep]
         
         self.gameOver = False
-        self.finalEnd = None
+        self.ended = False
+        self.newHigh = False
+        self.timers.clear()
+        self.bubbles.clear()
+        self.particles.clear()
+        self.audio.clear()
         self.targets[0].__init__(self, (0,0), 0.5)
         self.crosshair.__init__(self)
         self.stats.__init__(self)
@@ -746,6 +1151,11 @@ class TargetsGame:
                 
             self.update()
             pygame.display.update()
+            now = self.timers.get_time()
+            if self.capture != None and self.capture.is_due(now):
+                self.capture.capture(now)
+            if self.spectators != None and self.spectators.is_due(now):
+                self.spectators.publish(self.get_snapshot(), now)
             pygame.time.wait(10)
 
     def get_high_score(self):
@@ -775,5 +1185,25 @@ class TargetsGame:
         file.write(str(score)+" "+str(self.sound))
         file.close()
 
-pygame.init()
-TargetsGame()
+def positive_int(text):
+    '''positive_int(text) -> int
+    returns text as an int for argparse, rejecting 0 and below'''
+    value = int(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"must be above 0, not {value}")
+    return value
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="play Targets")
+    parser.add_argument("--spectator-port", type=int, help="stream the game to spectators on this port")
+    parser.add_argument("--spectator-rate", type=positive_int, default=15, help="snapshots sent to spectators a second")
+    parser.add_argument("--capture", help="record the game to this file or folder")
+    parser.add_argument("--capture-mode", choices=("raw", "png", "video"), default="raw", help="how to record the game")
+    parser.add_argument("--capture-rate", type=positive_int, default=30, help="frames recorded a second")
+    parser.add_argument("--effects-quality", type=float, default=1, help="amount of particle effects from 0 to 1")
+    parser.add_argument("--max-particles", type=int, default=4000, help="most particles alive at once")
+    args = parser.parse_args()
+
+    pygame.init()
+    TargetsGame(args.spectator_port, args.spectator_rate, args.capture, args.capture_mode, args.capture_rate,
+        args.effects_quality, args.max_particles)